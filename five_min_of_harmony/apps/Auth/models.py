@@ -1,9 +1,55 @@
+import uuid
+
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from django.conf import settings
+from django.core.signals import setting_changed
+
+
+_TICK = None
+
+# Cache key for the serialized `users_list` payload (see views.users_list).
+USERS_LIST_CACHE_KEY = "auth:users_list"
+
+# How long (seconds) views.login_view answers a rejected username/password
+# pair from cache.
+LOGIN_REJECTED_CACHE_SECONDS = 5
+
+
+def login_version_key(username):
+    return f"auth:login_version:{username}"
+
+
+def action_tick_seconds() -> int:
+    """Return the configured ACTION_TICK_SECONDS, read from settings once."""
+    global _TICK
+    if _TICK is None:
+        _TICK = getattr(settings, "ACTION_TICK_SECONDS", 300)
+    return _TICK
+
+
+@receiver(setting_changed)
+def reset_action_tick(sender, setting, **kwargs):
+    # Tests may override the setting; drop the cached value so it is re-read.
+    global _TICK
+    if setting == "ACTION_TICK_SECONDS":
+        _TICK = None
+
+
+class ProfileManager(models.Manager):
+    def ensure_for_users(self, users):
+        """Create missing profiles for `users` with a single bulk INSERT.
+
+        `User.objects.bulk_create` does not send post_save, so bulk imports
+        should call this afterwards instead of relying on
+        `create_profile_for_user`. Existing profiles are left untouched.
+        """
+        return self.bulk_create(
+            [self.model(user=user) for user in users], ignore_conflicts=True
+        )
 
 
 class Profile(models.Model):
@@ -17,14 +63,16 @@ class Profile(models.Model):
     user = models.OneToOneField(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="profile"
     )
-    last_used = models.DateTimeField(null=True, blank=True)
+    last_used = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    objects = ProfileManager()
 
     def __str__(self):
         return f"Profile({self.user.username})"
 
     @property
     def has_action(self) -> bool:
-        tick = getattr(settings, "ACTION_TICK_SECONDS", 300)
+        tick = action_tick_seconds()
         if self.last_used is None:
             return True
         elapsed = (timezone.now() - self.last_used).total_seconds()
@@ -35,3 +83,21 @@ class Profile(models.Model):
 def create_profile_for_user(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def invalidate_users_list(sender, **kwargs):
+    cache.delete(USERS_LIST_CACHE_KEY)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def bump_login_version(sender, instance, **kwargs):
+    # Rejected-credential cache entries embed this version, so any save of the
+    # user (registration, password change, ...) retires them. It only has to
+    # outlive those entries, hence the shared timeout.
+    cache.set(
+        login_version_key(instance.get_username()),
+        uuid.uuid4().hex,
+        LOGIN_REJECTED_CACHE_SECONDS,
+    )
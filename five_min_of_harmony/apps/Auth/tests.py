@@ -1,11 +1,22 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import hashers
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from .models import Profile, USERS_LIST_CACHE_KEY, action_tick_seconds
+
 
 class AuthApiTests(TestCase):
     def setUp(self):
+        # Cached payloads and login-failure counters must not leak between tests
+        cache.clear()
         self.User = get_user_model()
         self.username = "testuser"
         self.password = "pass123"
@@ -26,17 +37,39 @@ class AuthApiTests(TestCase):
         )
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
         # Response returns user info (no token when using cookie/session auth)
-        self.assertIn("username", resp.data)
+        self.assertIn("username", resp.json())
         # Ensure login response set a CSRF cookie for subsequent unsafe requests
         self.assertIn("csrftoken", self.client.cookies.keys())
 
         # The test client stores cookies from responses; use the same client to GET users
-        resp2 = self.client.get("/api/auth/users/")
+        # Queries: session, authenticated user, users list (profiles joined in)
+        with self.assertNumQueries(3):
+            resp2 = self.client.get("/api/auth/users/")
         self.assertEqual(resp2.status_code, status.HTTP_200_OK)
         # Expect at least one user matching the username
         usernames = [u.get("username") for u in resp2.data]
         self.assertIn(self.username, usernames)
 
+    async def test_login_hashes_password_off_the_event_loop(self):
+        # Password hashing is slow; it must not block the loop serving requests
+        loop_thread = threading.current_thread()
+        hash_threads = []
+        verify_password = hashers.verify_password
+
+        def spy(*args, **kwargs):
+            hash_threads.append(threading.current_thread())
+            return verify_password(*args, **kwargs)
+
+        with mock.patch.object(hashers, "verify_password", spy):
+            resp = await self.async_client.post(
+                "/api/auth/login/",
+                {"username": self.username, "password": self.password},
+                content_type="application/json",
+            )
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertTrue(hash_threads)
+        self.assertNotIn(loop_thread, hash_threads)
+
     def test_login_bad_credentials(self):
         resp = self.client.post(
             "/api/auth/login/",
@@ -44,7 +77,36 @@ class AuthApiTests(TestCase):
             format="json",
         )
         self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertIn("detail", resp.data)
+        self.assertIn("detail", resp.json())
+
+    def test_login_failures_are_rate_limited(self):
+        for _ in range(10):
+            resp = self.client.post(
+                "/api/auth/login/",
+                {"username": self.username, "password": "wrong"},
+                format="json",
+            )
+            self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # Even the correct password is refused once the IP hit the limit
+        resp = self.client.post(
+            "/api/auth/login/",
+            {"username": self.username, "password": self.password},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_login_after_register_is_not_rejected_from_cache(self):
+        # A failed login must not keep rejecting the pair once it becomes valid
+        credentials = {"username": "newuser", "password": "newpass123"}
+        resp = self.client.post("/api/auth/login/", credentials, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        resp = self.client.post("/api/auth/register/", credentials, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+
+        resp = APIClient().post("/api/auth/login/", credentials, format="json")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
 
     def test_register_user(self):
         # Ensure registration of a new user succeeds and returns a token
@@ -88,6 +150,99 @@ class AuthApiTests(TestCase):
         # Frontend should be able to GET a CSRF token and receive a cookie
         resp = self.client.get("/api/auth/csrf/")
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        self.assertIn("csrfToken", resp.data)
+        self.assertIn("csrfToken", resp.json())
         # The client should have received a csrftoken cookie
         self.assertIn("csrftoken", self.client.cookies.keys())
+
+    def test_has_action(self):
+        # Anonymous users are rejected like the DRF-backed endpoints
+        resp = self.client.get("/api/auth/has_action/")
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+        # A fresh user has never used their action, so it is available
+        self.client.force_login(self.user)
+        resp = self.client.get("/api/auth/has_action/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.json(), {"has_action": True})
+
+    def test_my_profile(self):
+        self.client.force_login(self.user)
+        resp = self.client.get("/api/auth/me/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(resp.data["username"], self.username)
+        self.assertEqual(resp.data["email"], self.email)
+        self.assertEqual(resp.data["time_until_next_action"], 0)
+        self.assertTrue(resp.data["has_action"])
+        self.assertIn("server_time", resp.data)
+        self.assertIn("private", resp["Cache-Control"])
+
+        # The rendered body (ORJSONRenderer) matches DRF's JSON conventions
+        body = resp.json()
+        self.assertEqual(body["username"], self.username)
+        self.assertIs(body["has_action"], True)
+        self.assertEqual(
+            body["server_time"],
+            resp.data["server_time"].isoformat().replace("+00:00", "Z"),
+        )
+
+    def test_action_unavailable_until_cooldown_fully_elapsed(self):
+        # Half a second before the tick ends, no endpoint may report the action
+        # as available while use_action would still refuse it
+        tick = action_tick_seconds()
+        Profile.objects.filter(user=self.user).update(
+            last_used=timezone.now() - timedelta(seconds=tick - 0.5)
+        )
+        self.client.force_login(self.user)
+
+        resp = self.client.get("/api/auth/me/")
+        self.assertFalse(resp.data["has_action"])
+        self.assertEqual(resp.data["time_until_next_action"], 1)
+        resp = self.client.get("/api/auth/has_action/")
+        self.assertEqual(resp.json(), {"has_action": False})
+        resp = self.client.post("/api/auth/use_action/")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_use_action(self):
+        self.client.force_login(self.user)
+        # Queries: session, authenticated user, conditional UPDATE
+        with self.assertNumQueries(3):
+            resp = self.client.post("/api/auth/use_action/")
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIn("next_available_in_seconds", resp.data)
+
+        # The action is now on cooldown until the next tick
+        resp = self.client.post("/api/auth/use_action/")
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("detail", resp.data)
+
+        resp = self.client.get("/api/auth/has_action/")
+        self.assertEqual(resp.json(), {"has_action": False})
+
+    def test_ensure_profiles_for_bulk_created_users(self):
+        # bulk_create skips post_save, so no profiles exist yet
+        users = self.User.objects.bulk_create(
+            [self.User(username=f"bulk{i}") for i in range(3)]
+        )
+        self.assertFalse(Profile.objects.filter(user__in=users).exists())
+
+        with self.assertNumQueries(1):
+            Profile.objects.ensure_for_users(users + [self.user])
+        self.assertEqual(Profile.objects.filter(user__in=users).count(), 3)
+        self.assertEqual(Profile.objects.filter(user=self.user).count(), 1)
+
+    def test_users_list_query_count_is_constant(self):
+        self.client.force_login(self.user)
+        cache.delete(USERS_LIST_CACHE_KEY)
+        with self.assertNumQueries(3):
+            resp = self.client.get("/api/auth/users/")
+        self.assertEqual(len(resp.data), 1)
+
+        for i in range(10):
+            self.User.objects.create_user(username=f"user{i}", password="pw")
+        with self.assertNumQueries(3):
+            resp = self.client.get("/api/auth/users/")
+        self.assertEqual(len(resp.data), 11)
+
+        # A repeat request within the cache window skips the users query
+        with self.assertNumQueries(2):
+            self.client.get("/api/auth/users/")
@@ -5,6 +5,7 @@ from .views import (
     register_view,
     my_profile,
     has_action,
+    use_action,
     csrf_view,
 )
 
@@ -14,5 +15,6 @@ urlpatterns = [
     path("users/", users_list, name="api_users"),
     path("me/", my_profile, name="api_me"),
     path("has_action/", has_action, name="api_has_action"),
+    path("use_action/", use_action, name="api_use_action"),
     path("csrf/", csrf_view, name="api_csrf"),
 ]
@@ -1,18 +1,31 @@
-from django.conf import settings
-from django.utils import timezone
-from .models import Profile
+import math
+import time
+
+from .models import Profile, action_tick_seconds
 
 
 def _safe_get_profile(user):
     """Return user's Profile or None if it doesn't exist.
 
-    Accessing `user.profile` raises Profile.DoesNotExist when missing, so
-    we catch that and return None to make callers robust.
+    Only `last_used` is loaded since that is all the callers read; a
+    missing row yields None to make callers robust.
     """
-    try:
-        return user.profile
-    except Profile.DoesNotExist:
-        return None
+    return Profile.objects.only("last_used").filter(user=user).first()
+
+
+def seconds_until_refill(last_used) -> int:
+    """Return number of seconds until an action last used at `last_used` refills.
+
+    Returns 0 when action is available now or `last_used` is None.
+    """
+    if last_used is None:
+        return 0
+
+    # Plain epoch seconds avoid building an aware datetime and timedelta.
+    elapsed = time.time() - last_used.timestamp()
+    # Round up: a partial second left still means `use_action` would refuse.
+    remaining = max(0, math.ceil(action_tick_seconds() - elapsed))
+    return remaining
 
 
 def time_until_next_action(user) -> int:
@@ -22,14 +35,9 @@ def time_until_next_action(user) -> int:
     `last_used` is missing, the action is considered available.
     """
     profile = _safe_get_profile(user)
-    tick = getattr(settings, "ACTION_TICK_SECONDS", 300)
-
-    if profile is None or profile.last_used is None:
+    if profile is None:
         return 0
-
-    elapsed = (timezone.now() - profile.last_used).total_seconds()
-    remaining = max(0, int(tick - elapsed))
-    return remaining
+    return seconds_until_refill(profile.last_used)
 
 
 def user_has_action(user) -> bool:
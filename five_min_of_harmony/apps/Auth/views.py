@@ -1,53 +1,163 @@
-from django.contrib.auth import authenticate, login
+import json
+from datetime import timedelta
+from asgiref.sync import sync_to_async
+from django.contrib.auth import alogin, authenticate, login
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from django.utils import timezone
-from django.conf import settings
-from .utils import time_until_next_action, user_has_action
+from django.db import IntegrityError, transaction
+from django.db.models import BooleanField, ExpressionWrapper, Q
+from .utils import seconds_until_refill, user_has_action
 from django.middleware.csrf import get_token
 from django.views.decorators.csrf import ensure_csrf_cookie
-from .models import Profile
+from django.views.decorators.http import require_GET, require_POST
+from django.views.decorators.cache import cache_control
+from django.core.cache import cache
+from django.utils.crypto import salted_hmac
+from django.http import JsonResponse
+from .models import (
+    LOGIN_REJECTED_CACHE_SECONDS,
+    USERS_LIST_CACHE_KEY,
+    Profile,
+    action_tick_seconds,
+    login_version_key,
+)
+
+# How long (seconds) a computed users_list payload is served from cache.
+USERS_LIST_CACHE_SECONDS = 5
+
+# Failed logins allowed per client IP within LOGIN_FAILURE_WINDOW seconds.
+# Counters live in the default cache, so with the LocMemCache default the
+# limit applies per worker process; set REDIS_URL to enforce it per IP.
+# The IP is REMOTE_ADDR as seen by Django: behind a reverse proxy every client
+# shares the proxy's address (and therefore one counter) unless the proxy
+# setup rewrites REMOTE_ADDR to the real client address.
+LOGIN_FAILURE_LIMIT = 10
+LOGIN_FAILURE_WINDOW = 60
+
+
+def _parse_body(request):
+    """Return the POSTed fields as a dict, or None if the JSON body is malformed.
+
+    Accepts JSON bodies (what the frontend sends) as well as form posts.
+    """
+    if request.content_type != "application/json":
+        return request.POST
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _login_failures_key(request):
+    return f"auth:login_failures:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def _login_rejected_key(username, password, version):
+    # Keyed on an HMAC so neither the password nor a plain hash of it is cached.
+    # `version` changes whenever the user is saved (see models.bump_login_version)
+    # so a pair rejected before registration or a password change is retried.
+    digest = salted_hmac(
+        "auth.login_rejected", f"{username}\0{password}\0{version}"
+    )
+    return f"auth:login_rejected:{digest.hexdigest()}"
 
 
 @ensure_csrf_cookie
-@api_view(["POST"])
-@permission_classes([permissions.AllowAny])
-def login_view(request):
+@require_POST
+async def login_view(request):
     """Authenticate a user and create a session (cookie).
 
+    This is a native async Django view: password hashing is deliberately
+    slow, so `authenticate` runs in a worker thread via `sync_to_async` and
+    the event loop keeps serving other requests. (`aauthenticate` is not
+    used: it verifies the password on the event loop thread.) CSRF is
+    checked by the middleware, so clients send `X-CSRFToken` (from
+    `csrf_view`).
+
+    To keep password-guessing floods from pinning the CPU, a username/password
+    pair that just failed is rejected from cache without hashing again, and
+    an IP is refused outright after LOGIN_FAILURE_LIMIT failures per window
+    (per worker process unless a shared cache is configured).
+
     Expected POST body: {"username": "...", "password": "..."}
     Response (200): {"username": "...", "email": "..."}
     Response (400): {"detail": "Invalid credentials"}
+    Response (429): {"detail": "too many failed login attempts"}
     """
-    username = request.data.get("username")
-    password = request.data.get("password")
+    data = _parse_body(request)
+    if data is None:
+        return JsonResponse(
+            {"detail": "malformed request body"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    username = data.get("username")
+    password = data.get("password")
 
     if not username or not password:
-        return Response(
+        return JsonResponse(
             {"detail": "username and password required"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    user = authenticate(request, username=username, password=password)
+    failures_key = _login_failures_key(request)
+    if await cache.aget(failures_key, 0) >= LOGIN_FAILURE_LIMIT:
+        return JsonResponse(
+            {"detail": "too many failed login attempts"},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+        )
+
+    version = await cache.aget(login_version_key(username), "")
+    rejected_key = _login_rejected_key(username, password, version)
+    user = None
+    if not await cache.aget(rejected_key):
+        user = await sync_to_async(authenticate)(
+            request, username=username, password=password
+        )
     if user is None:
-        return Response(
+        await cache.aset(rejected_key, True, LOGIN_REJECTED_CACHE_SECONDS)
+        if not await cache.aadd(failures_key, 1, LOGIN_FAILURE_WINDOW):
+            try:
+                await cache.aincr(failures_key)
+            except ValueError:
+                # The counter expired between aadd and aincr; start a new window.
+                await cache.aset(failures_key, 1, LOGIN_FAILURE_WINDOW)
+        return JsonResponse(
             {"detail": "Invalid credentials"}, status=status.HTTP_400_BAD_REQUEST
         )
 
     # Log the user in to create a session cookie
-    login(request, user)
-    return Response({"username": user.username, "email": user.email})
+    await alogin(request, user)
+    return JsonResponse({"username": user.username, "email": user.email})
 
 
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def users_list(request):
-    """Return a list of users (username and email). Requires authentication."""
-    User = get_user_model()
-    qs = User.objects.all().values("username", "email")
-    return Response(list(qs))
+    """Return a list of users (username, email, has_action). Requires authentication.
+
+    `has_action` is computed in the database so rows come back as plain
+    dicts without instantiating User or Profile models. The result is
+    cached for a few seconds since the SPA polls this endpoint; it is
+    cached after the permission check, unlike `cache_page`.
+    """
+    users = cache.get(USERS_LIST_CACHE_KEY)
+    if users is None:
+        User = get_user_model()
+        tick = action_tick_seconds()
+        cutoff = timezone.now() - timedelta(seconds=tick)
+        available = Q(profile__last_used__isnull=True) | Q(
+            profile__last_used__lte=cutoff
+        )
+        qs = User.objects.annotate(
+            has_action=ExpressionWrapper(available, output_field=BooleanField())
+        ).values("username", "email", "has_action")
+        users = list(qs)
+        cache.set(USERS_LIST_CACHE_KEY, users, USERS_LIST_CACHE_SECONDS)
+    return Response(users)
 
 
 @ensure_csrf_cookie
@@ -70,13 +180,21 @@ def register_view(request):
         )
 
     User = get_user_model()
-    if User.objects.filter(username=username).exists():
+    # Let the UNIQUE constraint on username reject duplicates instead of
+    # checking first; the savepoint keeps any outer transaction usable.
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=username, email=email, password=password
+            )
+    except IntegrityError:
         return Response(
             {"detail": "username already exists"},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    user = User.objects.create_user(username=username, email=email, password=password)
+    # The Profile row is created by the `create_profile_for_user` post_save
+    # receiver, so no explicit Profile lookup/creation is needed here.
     # Log the newly created user in (session cookie)
     login(request, user)
     return Response(
@@ -85,35 +203,60 @@ def register_view(request):
     )
 
 
+@cache_control(private=True, max_age=1)
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def my_profile(request):
-    """Return username, email, and time until next action (seconds).
+    """Return username, email, and the user's action state.
+
+    `server_time` lets clients run the countdown locally from
+    `time_until_next_action` instead of polling every second.
 
     Response example (200):
-    {"username": "...", "email": "...", "time_until_next_action": 0}
+    {"username": "...", "email": "...", "has_action": true,
+     "time_until_next_action": 0, "server_time": "2025-01-01T00:00:00Z"}
     """
-    user = request.user
-    remaining = time_until_next_action(user)
+    # One query for the user's fields and the profile's last_used together.
+    User = get_user_model()
+    row = (
+        User.objects.filter(pk=request.user.pk)
+        .values("username", "email", "profile__last_used")
+        .first()
+    )
+    remaining = seconds_until_refill(row["profile__last_used"])
 
     return Response(
         {
-            "username": user.username,
-            "email": user.email,
+            "username": row["username"],
+            "email": row["email"],
+            "has_action": remaining == 0,
             "time_until_next_action": remaining,
+            "server_time": timezone.now(),
         }
     )
 
 
-@api_view(["GET"])
-@permission_classes([permissions.IsAuthenticated])
+@require_GET
+@cache_control(private=True, max_age=1)
 def has_action(request):
     """Return whether the authenticated user currently has an action available.
 
+    Deprecated: `my_profile` returns `has_action` together with the countdown;
+    this endpoint is kept for existing clients.
+
+    This is a plain Django view rather than a DRF one: it is polled often and
+    the payload is tiny, so DRF's request wrapping and content negotiation
+    would dominate the cost.
+
     Response example (200): {"has_action": true}
+    Response (403): {"detail": "Authentication credentials were not provided."}
     """
-    user = request.user
-    return Response({"has_action": user_has_action(user)})
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    return JsonResponse({"has_action": user_has_action(request.user)})
 
 
 @api_view(["POST"])
@@ -128,19 +271,31 @@ def use_action(request):
     returned indicating the action is on cooldown.
     """
     user = request.user
-    profile, _ = Profile.objects.get_or_create(user=user)
-    if not profile.has_action:
-        return Response(
-            {"detail": "action not available"}, status=status.HTTP_400_BAD_REQUEST
+    now = timezone.now()
+    cutoff = now - timedelta(seconds=action_tick_seconds())
+    # A single conditional UPDATE both checks the cooldown and consumes the
+    # action, so concurrent requests cannot spend the same action twice.
+    updated = (
+        Profile.objects.filter(user=user)
+        .filter(Q(last_used__isnull=True) | Q(last_used__lte=cutoff))
+        .update(last_used=now)
+    )
+    if not updated:
+        # Profiles are created by the post_save receiver; only users that
+        # predate it can be missing one.
+        _, created = Profile.objects.get_or_create(
+            user=user, defaults={"last_used": now}
         )
-    profile.last_used = timezone.now()
-    profile.save()
+        if not created:
+            return Response(
+                {"detail": "action not available"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+    cache.delete(USERS_LIST_CACHE_KEY)
     return Response(
         {
             "detail": "action consumed",
-            "next_available_in_seconds": int(
-                getattr(settings, "ACTION_TICK_SECONDS", 300)
-            ),
+            "next_available_in_seconds": int(action_tick_seconds()),
         }
     )
 
@@ -149,13 +304,13 @@ def use_action(request):
 # and return the current token in JSON so SPA frontends can bootstrap and include
 # the token in subsequent unsafe requests (POST/PUT/DELETE).
 @ensure_csrf_cookie
-@api_view(["GET"])
-@permission_classes([permissions.AllowAny])
+@require_GET
 def csrf_view(request):
     """Return a CSRF token and ensure the CSRF cookie is set.
 
     This uses Django's ensure_csrf_cookie decorator so cookie attributes
-    (samesite, secure, domain) follow settings automatically.
+    (samesite, secure, domain) follow settings automatically. Like
+    `has_action`, it is a plain Django view to skip DRF overhead.
     """
     token = get_token(request)
-    return Response({"csrfToken": token})
+    return JsonResponse({"csrfToken": token})
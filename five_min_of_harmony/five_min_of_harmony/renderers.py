@@ -0,0 +1,42 @@
+import orjson
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that serializes with orjson instead of the stdlib `json`.
+
+    Types orjson does not know natively (Decimal, lazy strings, ...) are
+    handed to DRF's own encoder. Pretty-printed requests (e.g. from the
+    browsable API) and payloads orjson rejects (such as integers wider than
+    64 bits) go through the stock JSONRenderer.
+
+    Output is equivalent JSON but not always byte-identical to JSONRenderer:
+    large floats use orjson's exponent format (`1e16` rather than `1e+16`),
+    and NaN/Infinity render as `null` instead of raising under STRICT_JSON.
+    """
+
+    _encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self._encoder.default,
+                option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Match JSONRenderer, which escapes U+2028/U+2029 for JavaScript.
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
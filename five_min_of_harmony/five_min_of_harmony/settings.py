@@ -106,6 +106,45 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# Per-process memory cache by default; set REDIS_URL in .env to share the
+# cache between workers.
+# Example: REDIS_URL=redis://127.0.0.1:6379/0
+if config.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": config["REDIS_URL"],
+        }
+    }
+    # Serve sessions from the shared cache and fall back to the database on a
+    # miss, so authenticated requests usually skip the session SELECT. Only
+    # safe with a shared cache: with a per-process one, logging out would
+    # leave the session cached (and valid) in the other workers.
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/#using-argon2-with-django
+
+# Argon2 (argon2-cffi) is used for new hashes; the rest remain so existing
+# PBKDF2 hashes still verify and get upgraded on the user's next login.
+PASSWORD_HASHERS = [
+    "apps.Auth.hashers.TunedArgon2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -150,6 +189,11 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly"
     ],
+    # orjson-backed JSON output; the browsable API is kept for development.
+    "DEFAULT_RENDERER_CLASSES": [
+        "five_min_of_harmony.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
 # How many seconds between action refills for a user. Can be overridden by .env